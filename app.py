@@ -10,9 +10,24 @@ import re
 from pathlib import Path
 import streamlit.components.v1 as components
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 
 st.set_page_config(page_title="Hospital Schedule Agent", page_icon="🏥", layout="wide")
 
+MERMAID_PATTERN = re.compile(r'```mermaid\n(.*?)\n```', re.DOTALL)
+JSON_DECODER = json.JSONDecoder()
+
+# Each components.html call renders in its own iframe, so every diagram needs
+# the loader; keeping it identical lets the browser serve it from cache.
+MERMAID_LOADER = """<script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
+    <script>
+        mermaid.initialize({ startOnLoad: true });
+    </script>"""
+
 
 @st.cache_resource
 def load_agentcore_config():
@@ -23,20 +38,39 @@ def load_agentcore_config():
         st.stop()
     
     with open(config_path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YamlLoader)
 
 
-def encode_file(file_bytes):
-    """Encode file to base64."""
-    return base64.b64encode(file_bytes).decode()
+def encode_file(file_obj, chunk_size=3 * 64 * 1024):
+    """Encode file-like object to base64 in chunks.
+    
+    chunk_size must stay a multiple of 3 so no padding is emitted mid-stream.
+    """
+    chunks = []
+    while chunk := file_obj.read(chunk_size):
+        chunks.append(base64.b64encode(chunk).decode('ascii'))
+    return ''.join(chunks)
 
 
-def invoke_agent(prompt, files=None, model=None):
-    """Invoke AgentCore agent."""
+@st.cache_data(max_entries=32, show_spinner=False)
+def decode_file(file_content):
+    """Decode base64 file content, memoized across reruns."""
+    return base64.b64decode(file_content)
+
+
+@st.cache_resource
+def get_agent_client():
+    """Create the AgentCore client once and resolve the default agent ARN."""
     config = load_agentcore_config()
     agent_name = config['default_agent']
     agent_arn = config['agents'][agent_name]['bedrock_agentcore']['agent_arn']
     region = config['agents'][agent_name]['aws']['region']
+    return boto3.client('bedrock-agentcore', region_name=region), agent_arn
+
+
+def invoke_agent(prompt, files=None, model=None):
+    """Invoke AgentCore agent."""
+    client, agent_arn = get_agent_client()
     
     payload = {"prompt": prompt}
     if files:
@@ -44,7 +78,6 @@ def invoke_agent(prompt, files=None, model=None):
     if model:
         payload["model"] = model
     
-    client = boto3.client('bedrock-agentcore', region_name=region)
     response = client.invoke_agent_runtime(
         agentRuntimeArn=agent_arn,
         runtimeSessionId=st.session_state.session_id,
@@ -56,11 +89,10 @@ def invoke_agent(prompt, files=None, model=None):
 
 def extract_mermaid(text):
     """Extract Mermaid diagram from text and return text without mermaid, mermaid code."""
-    pattern = r'```mermaid\n(.*?)\n```'
-    match = re.search(pattern, text, re.DOTALL)
+    match = MERMAID_PATTERN.search(text)
     if match:
         mermaid_code = match.group(1)
-        text_without_mermaid = re.sub(pattern, '', text, flags=re.DOTALL).strip()
+        text_without_mermaid = (text[:match.start()] + text[match.end():]).strip()
         return text_without_mermaid, mermaid_code
     return text, None
 
@@ -68,18 +100,20 @@ def extract_mermaid(text):
 def extract_file_content(response):
     """Extract base64 file content from agent response."""
     result = response.get('result', '')
-    # Check if result contains file_content
-    if 'file_content' in str(result):
-        import json
-        # Try to parse as JSON if it's a tool result
-        if isinstance(result, str) and '{' in result:
-            # Extract JSON from text
-            start = result.find('{')
-            end = result.rfind('}') + 1
-            if start >= 0 and end > start:
-                data = json.loads(result[start:end])
-                if 'file_content' in data:
-                    return data['file_content'], data.get('file_path', 'schedule.xlsx')
+    # Only tool results rendered as text can carry file_content
+    if not isinstance(result, str) or 'file_content' not in result:
+        return None, None
+    
+    # Parse the first JSON object in place instead of slicing it out
+    start = result.find('{')
+    if start < 0:
+        return None, None
+    try:
+        data, _ = JSON_DECODER.raw_decode(result, start)
+    except json.JSONDecodeError:
+        return None, None
+    if isinstance(data, dict) and 'file_content' in data:
+        return data['file_content'], data.get('file_path', 'schedule.xlsx')
     return None, None
 
 
@@ -88,10 +122,7 @@ def render_mermaid(mermaid_code):
     html = f"""
     <html>
     <head>
-    <script src="https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"></script>
-    <script>
-        mermaid.initialize({{ startOnLoad: true }});
-    </script>
+    {MERMAID_LOADER}
     </head>
     <body>
     <div class="mermaid">
@@ -105,7 +136,7 @@ def render_mermaid(mermaid_code):
 
 # Initialize session state
 if 'session_id' not in st.session_state:
-    st.session_state.session_id = f"streamlit-{str(uuid.uuid4())}"
+    st.session_state.session_id = f"streamlit-{uuid.uuid4().hex}"
 if 'messages' not in st.session_state:
     st.session_state.messages = []
 
@@ -145,9 +176,9 @@ with st.sidebar:
     
     if st.button("Upload Files", disabled=not (therapist_file and prescription_file and shift_file)):
         files = {
-            "therapist_csv": encode_file(therapist_file.read()),
-            "prescription_csv": encode_file(prescription_file.read()),
-            "shift_excel": encode_file(shift_file.read())
+            "therapist_csv": encode_file(therapist_file),
+            "prescription_csv": encode_file(prescription_file),
+            "shift_excel": encode_file(shift_file)
         }
         
         with st.spinner("Uploading files..."):
@@ -170,7 +201,7 @@ for msg in st.session_state.messages:
             file_name = msg["file_download"]["name"]
             st.download_button(
                 label=f"📥 Download {file_name}",
-                data=base64.b64decode(file_content),
+                data=decode_file(file_content),
                 file_name=file_name,
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -197,7 +228,7 @@ if prompt := st.chat_input("Ask the agent..."):
                 file_name = file_path.split('/')[-1] if '/' in file_path else file_path
                 st.download_button(
                     label=f"📥 Download {file_name}",
-                    data=base64.b64decode(file_content),
+                    data=decode_file(file_content),
                     file_name=file_name,
                     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                 )
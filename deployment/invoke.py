@@ -1,11 +1,59 @@
+import threading
+from collections import OrderedDict
 from bedrock_agentcore.runtime import BedrockAgentCoreApp, BedrockAgentCoreContext
 from schedule_agent.core.data_store import DataStore
 from schedule_agent.agent.agent import create_schedule_agent
 
 app = BedrockAgentCoreApp()
 
-# Session-specific DataStore storage
-session_datastores = {}
+# Session-specific DataStore and per-model Agent storage
+# (least recently used sessions are evicted)
+MAX_SESSIONS = 100
+session_datastores: OrderedDict[str, tuple[DataStore, dict]] = OrderedDict()
+session_lock = threading.Lock()
+
+
+def store_session_datastore(session_id: str, data_store: DataStore) -> dict:
+    """Register DataStore for session, cleaning up replaced or evicted ones.
+    
+    Returns the (empty) model_key -> Agent dict bound to the new DataStore.
+    """
+    agents = {}
+    with session_lock:
+        old_entry = session_datastores.pop(session_id, None)
+        session_datastores[session_id] = (data_store, agents)
+        evicted = []
+        while len(session_datastores) > MAX_SESSIONS:
+            evicted.append(session_datastores.popitem(last=False))
+    
+    if old_entry is not None and old_entry[0] is not data_store:
+        print(f"DEBUG: Cleaning up old DataStore for session {session_id}")
+        old_entry[0].cleanup()
+    for evicted_session_id, (evicted_data_store, _) in evicted:
+        print(f"DEBUG: Evicting DataStore for session {evicted_session_id}")
+        evicted_data_store.cleanup()
+    return agents
+
+
+def get_session_datastore(session_id: str):
+    """Return (DataStore, agents) for session and mark it as recently used."""
+    with session_lock:
+        entry = session_datastores.get(session_id)
+        if entry is not None:
+            session_datastores.move_to_end(session_id)
+        return entry
+
+
+def get_session_agent(agents: dict, data_store: DataStore, model_key: str):
+    """Return the session's agent for model_key, creating it on first use."""
+    with session_lock:
+        agent = agents.get(model_key)
+    if agent is None:
+        agent = create_schedule_agent(data_store, model_key)
+        with session_lock:
+            agent = agents.setdefault(model_key, agent)
+    return agent
+
 
 @app.entrypoint
 def invoke(payload):
@@ -14,7 +62,8 @@ def invoke(payload):
     
     # Debug: log session ID
     print(f"DEBUG: Session ID = {session_id}")
-    print(f"DEBUG: Current sessions = {list(session_datastores.keys())}")
+    with session_lock:
+        print(f"DEBUG: Current sessions = {list(session_datastores.keys())}")
     
     # Extract model from payload (optional)
     model_key = payload.get("model")
@@ -31,12 +80,6 @@ def invoke(payload):
     if "therapist_csv" in payload:
         print(f"DEBUG: Uploading files for session {session_id}")
         
-        # Clean up old session if it exists
-        if session_id in session_datastores:
-            print(f"DEBUG: Cleaning up old DataStore for session {session_id}")
-            old_data_store = session_datastores[session_id]
-            old_data_store.cleanup()
-        
         # Create new DataStore for this session
         data_store = DataStore()
         data_store.initialize()  # Initialize without context manager
@@ -45,8 +88,8 @@ def invoke(payload):
         data_store.copy_prescription_file_from_bytes(payload)
         data_store.copy_shift_file_from_bytes(payload)
         
-        # Store DataStore for this session
-        session_datastores[session_id] = data_store
+        # Store DataStore for this session (replaces and cleans up any old one)
+        agents = store_session_datastore(session_id, data_store)
         
         print(f"DEBUG: Stored DataStore for session {session_id}")
         
@@ -55,18 +98,19 @@ def invoke(payload):
 
 {user_message}"""
         
-    elif session_id in session_datastores:
+    elif (entry := get_session_datastore(session_id)) is not None:
         print(f"DEBUG: Reusing DataStore for session {session_id}")
-        data_store = session_datastores[session_id]
+        data_store, agents = entry
         schedule_request = payload.get("prompt", "Hello")
         
     else:
         print(f"DEBUG: No DataStore found for session {session_id}, creating new one")
         data_store = DataStore()
+        agents = {}
         schedule_request = payload.get("prompt", "Hello")
     
-    # Create agent once with the determined DataStore and model
-    agent = create_schedule_agent(data_store, model_key)
+    # Reuse the session's agent for this model, creating it on first use
+    agent = get_session_agent(agents, data_store, model_key)
     response = agent(schedule_request)
     
     return {"result": str(response)}
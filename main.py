@@ -3,24 +3,40 @@
 import argparse
 import base64
 import json
-import boto3
-import yaml
+from functools import lru_cache
 from pathlib import Path
-from schedule_agent.core.data_store import DataStore
-from schedule_agent.agent.agent import create_schedule_agent
 
 
+@lru_cache(maxsize=1)
 def load_agentcore_config():
-    """Load AgentCore configuration from deployment directory."""
+    """Load AgentCore configuration from deployment directory (parsed once per process)."""
     config_path = Path("deployment/.bedrock_agentcore.yaml")
     if not config_path.exists():
         raise FileNotFoundError("AgentCore config not found. Run deployment first.")
     
+    import yaml
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    
     with open(config_path) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
     return config
 
 
+def encode_file(file_path, chunk_size=3 * 64 * 1024):
+    """Encode file to base64 in chunks.
+    
+    chunk_size must stay a multiple of 3 so no padding is emitted mid-stream.
+    """
+    chunks = []
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            chunks.append(base64.b64encode(chunk).decode('ascii'))
+    return ''.join(chunks)
+
+
 def encode_files():
     """Encode data files to base64."""
     data_dir = Path("data")
@@ -29,20 +45,17 @@ def encode_files():
     # Encode therapist.csv
     therapist_file = data_dir / "therapist.csv"
     if therapist_file.exists():
-        with open(therapist_file, 'rb') as f:
-            files["therapist_csv"] = base64.b64encode(f.read()).decode()
+        files["therapist_csv"] = encode_file(therapist_file)
     
     # Encode prescription.csv
     prescription_file = data_dir / "prescription.csv"
     if prescription_file.exists():
-        with open(prescription_file, 'rb') as f:
-            files["prescription_csv"] = base64.b64encode(f.read()).decode()
+        files["prescription_csv"] = encode_file(prescription_file)
     
     # Encode shift Excel file (find any .xlsx file)
     shift_files = list(data_dir.glob("*.xlsx"))
     if shift_files:
-        with open(shift_files[0], 'rb') as f:
-            files["shift_excel"] = base64.b64encode(f.read()).decode()
+        files["shift_excel"] = encode_file(shift_files[0])
     
     return files
 
@@ -62,9 +75,10 @@ def invoke_remote_agent(prompt, files=None, session_id=None):
     # Use provided session ID or generate one
     if not session_id:
         import uuid
-        session_id = f"test-session-{str(uuid.uuid4())}"
+        session_id = f"test-session-{uuid.uuid4().hex}"
     
     # Invoke agent
+    import boto3
     client = boto3.client('bedrock-agentcore', region_name=region)
     response = client.invoke_agent_runtime(
         agentRuntimeArn=agent_arn,
@@ -91,7 +105,7 @@ def main():
         
         # Generate one session ID for the entire conversation
         import uuid
-        session_id = f"test-session-{str(uuid.uuid4())}"
+        session_id = f"test-session-{uuid.uuid4().hex}"
         print(f"Session ID: {session_id}\n")
         
         try:
@@ -123,7 +137,10 @@ def main():
             print(f"Error: {e}")
     
     else:
-        # Original local mode
+        # Original local mode (agent and data stack are only imported here)
+        from schedule_agent.core.data_store import DataStore
+        from schedule_agent.agent.agent import create_schedule_agent
+        
         data_store = DataStore()
         
         with data_store.session():
@@ -1,5 +1,7 @@
 """Agent configuration and prompts - separated from implementation."""
 
+from types import MappingProxyType
+
 AGENT_NAME = "hospital_schedule_agent"
 
 SYSTEM_PROMPT = """You are a hospital scheduling assistant that helps create and optimize therapy schedules.
@@ -78,8 +80,8 @@ When modifying constraints:
 
 AGENT_DESCRIPTION = "Unified agent for hospital therapy scheduling - handles creation,error analysis, and optimization"
 
-# Available Claude models
-AVAILABLE_MODELS = {
+# Available Claude models (read-only, shared by every agent instance)
+AVAILABLE_MODELS = MappingProxyType({
     "claude-sonnet-4-1": "us.anthropic.claude-sonnet-4-20250514-v1:0",
     "claude-sonnet-4-5": "us.anthropic.claude-sonnet-4-5-20250929-v1:0", 
     "claude-haiku-4-5": "us.anthropic.claude-haiku-4-5-20251001-v1:0",
@@ -88,7 +90,7 @@ AVAILABLE_MODELS = {
     "qwen-3-32b": "qwen.qwen3-32b-v1:0",
     "gpt-oss-120b": "openai.gpt-oss-120b-1:0",
     "gpt-oss-20b": "openai.gpt-oss-20b-1:0"
-}
+})
 
 # Default model configuration
 DEFAULT_MODEL_CONFIG = {
@@ -5,6 +5,9 @@ from schedule_agent.core.data_store import DataStore
 from schedule_agent.agent.agent import create_schedule_agent
 from schedule_agent.agent.config import AVAILABLE_MODELS
 
+# Model specification like "use claude-sonnet-4-5" or "model: qwen-3-32b"
+MODEL_PATTERN = re.compile(r'(?:use|model:?)\s+([a-z0-9-]+)', re.IGNORECASE)
+
 
 def extract_model_from_prompt(prompt: str) -> tuple[str, str]:
     """Extract model specification from user prompt.
@@ -15,15 +18,11 @@ def extract_model_from_prompt(prompt: str) -> tuple[str, str]:
     Returns:
         Tuple of (model_key, cleaned_prompt)
     """
-    # Look for model specification like "use claude-sonnet-4-5" or "model: claude-haiku-4-5"
-    model_pattern = r'(?:use|model:?)\s+(claude-[a-z0-9-]+)'
-    match = re.search(model_pattern, prompt.lower())
-    
-    if match:
-        model_key = match.group(1)
+    for match in MODEL_PATTERN.finditer(prompt):
+        model_key = match.group(1).lower()
         if model_key in AVAILABLE_MODELS:
             # Remove model specification from prompt
-            cleaned_prompt = re.sub(model_pattern, '', prompt, flags=re.IGNORECASE).strip()
+            cleaned_prompt = (prompt[:match.start()] + prompt[match.end():]).strip()
             return model_key, cleaned_prompt
     
     return None, prompt
@@ -37,7 +36,7 @@ def main():
     
     print("Hospital Schedule Agent initialized.")
     print(f"Available models: {', '.join(AVAILABLE_MODELS.keys())}")
-    print("Specify model with: 'use claude-sonnet-4-5' or 'model: claude-haiku-4-5'")
+    print("Specify model with: 'use claude-sonnet-4-5' or 'model: qwen-3-32b'")
     print("Type 'exit' or 'quit' to end the session.\n")
     
     try:
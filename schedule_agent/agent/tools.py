@@ -1,11 +1,16 @@
 """Agent tools for schedule operations."""
 
+import base64
+import io
 from typing import Dict, Any, Optional
 from pathlib import Path
+import numpy as np
+import pandas as pd
 from strands import tool
 from schedule_agent.core.data_store import DataStore
 from schedule_agent.core.pipeline import SchedulingPipeline
 from schedule_agent.utils.visualization import ScheduleVisualizer
+from schedule_agent.utils.time_utils import generate_timeslots
 
 
 class ScheduleNotAvailableError(Exception):
@@ -28,6 +33,30 @@ class InvalidTimeslotError(Exception):
     pass
 
 
+# The slot list is fixed, so the list_available_timeslots response is built once
+_TIMESLOTS = [{"index": i, "timeslot": slot} for i, slot in enumerate(generate_timeslots())]
+_TIMESLOTS_RESPONSE = {
+    "total_slots": len(_TIMESLOTS),
+    "morning_slots": [s for s in _TIMESLOTS if s["timeslot"] < "12:00"],  # 9:00-12:00
+    "afternoon_slots": [s for s in _TIMESLOTS if s["timeslot"] >= "12:00"],  # 13:00-16:00
+}
+
+
+def _search_mask(df: pd.DataFrame, columns: list[str], query: str) -> pd.Series:
+    """Rows where any of the columns contains query (case-insensitive substring)."""
+    mask = pd.Series(False, index=df.index)
+    for column in columns:
+        mask |= df[column].str.contains(query, case=False, regex=False, na=False)
+    return mask
+
+
+def _attribute_lookup(df: pd.DataFrame, id_column: str, ids: set[str],
+                      columns: dict[str, str]) -> dict[str, dict[str, Any]]:
+    """Map each ID in ids to its first row's columns, renamed to output keys."""
+    rows = df[df[id_column].isin(ids)].drop_duplicates(id_column)
+    return rows.set_index(id_column)[list(columns)].rename(columns=columns).to_dict('index')
+
+
 def create_schedule_tools(data_store: DataStore):
     """Create schedule tools with shared data store."""
     
@@ -39,22 +68,15 @@ def create_schedule_tools(data_store: DataStore):
         """Search patients by partial name, ID, or ward code."""
         df = data_store.load_normalized_prescriptions()
         
-        mask = (
-            df['患者ID'].str.contains(query, case=False, na=False) |
-            df['氏名'].str.contains(query, case=False, na=False) |
-            df['病棟'].str.contains(query, case=False, na=False)
-        )
-        
-        matches = df[mask].drop_duplicates('患者ID')
+        mask = _search_mask(df, ['患者ID', '氏名', '病棟'], query)
+        matches = df.loc[mask, ['患者ID', '氏名', '病棟', '担当療法士']].drop_duplicates('患者ID')
         
-        results = []
-        for _, row in matches.iterrows():
-            results.append({
-                "patient_id": row['患者ID'],
-                "name": row['氏名'],
-                "ward": row['病棟'],
-                "primary_therapist": row['担当療法士']
-            })
+        results = matches.rename(columns={
+            '患者ID': "patient_id",
+            '氏名': "name",
+            '病棟': "ward",
+            '担当療法士': "primary_therapist"
+        }).to_dict('records')
         
         return {
             "query": query,
@@ -67,23 +89,17 @@ def create_schedule_tools(data_store: DataStore):
         """Search therapists by partial name, ID, or ward code."""
         df = data_store.load_normalized_therapists()
         
-        mask = (
-            df['職員ID'].str.contains(query, case=False, na=False) |
-            df['漢字氏名'].str.contains(query, case=False, na=False) |
-            df['担当病棟'].str.contains(query, case=False, na=False)
-        )
+        mask = _search_mask(df, ['職員ID', '漢字氏名', '担当病棟'], query)
+        matches = df.loc[mask, ['職員ID', '漢字氏名', '性別', '担当病棟', '専従']]
         
-        matches = df[mask]
-        
-        results = []
-        for _, row in matches.iterrows():
-            results.append({
-                "therapist_id": row['職員ID'],
-                "name": row['漢字氏名'],
-                "gender": row['性別'],
-                "ward": row['担当病棟'],
-                "exclusive": row['専従'] == "〇"
-            })
+        # 専従 is already a boolean after normalization
+        results = matches.rename(columns={
+            '職員ID': "therapist_id",
+            '漢字氏名': "name",
+            '性別': "gender",
+            '担当病棟': "ward",
+            '専従': "exclusive"
+        }).to_dict('records')
         
         return {
             "query": query,
@@ -94,25 +110,7 @@ def create_schedule_tools(data_store: DataStore):
     @tool
     def list_available_timeslots() -> Dict[str, Any]:
         """List all available time slots."""
-        from schedule_agent.utils.time_utils import generate_timeslots
-        
-        slots = generate_timeslots()
-        
-        morning_slots = []
-        afternoon_slots = []
-        
-        for i, slot in enumerate(slots):
-            slot_info = {"index": i, "timeslot": slot}
-            if i < 8:  # 9:00-12:00
-                morning_slots.append(slot_info)
-            else:  # 13:00-16:40
-                afternoon_slots.append(slot_info)
-        
-        return {
-            "total_slots": len(slots),
-            "morning_slots": morning_slots,
-            "afternoon_slots": afternoon_slots
-        }
+        return _TIMESLOTS_RESPONSE
 
     @tool
     def create_schedule(target_date: str) -> Dict[str, Any]:
@@ -183,12 +181,11 @@ def create_schedule_tools(data_store: DataStore):
         if not data_store.load_schedule():
             raise ScheduleNotAvailableError("No schedule available. Create a schedule first using create_schedule()")
         
-        visualizer.export_to_excel(data_store, Path(output_path))
-        
-        # Read and encode file for client download
-        import base64
-        with open(output_path, 'rb') as f:
-            file_content = base64.b64encode(f.read()).decode()
+        # Build the workbook in memory, then write it out and encode it from the same buffer
+        buffer = io.BytesIO()
+        visualizer.export_to_excel(data_store, buffer)
+        Path(output_path).write_bytes(buffer.getbuffer())
+        file_content = base64.b64encode(buffer.getbuffer()).decode()
         
         return {"file_path": output_path, "file_content": file_content}
     
@@ -204,60 +201,64 @@ def create_schedule_tools(data_store: DataStore):
         Returns:
             Dictionary with enriched assignments list including patient and therapist attributes.
         """
-        if not data_store.load_schedule():
+        schedule = data_store.load_schedule()
+        if not schedule:
             raise ScheduleNotAvailableError("No schedule available. Create a schedule first using create_schedule()")
         
         matrices = data_store.load_all_matrices()
         
-        if patient_id and patient_id not in matrices.patient_ids:
+        if patient_id and patient_id not in matrices.patient_index:
             raise PatientNotFoundError(
                 f"Patient '{patient_id}' not found in constraint matrices. "
                 f"Available patients: {', '.join(map(str, matrices.patient_ids[:5]))}..."
             )
         
-        if therapist_id and therapist_id not in matrices.therapist_ids:
+        if therapist_id and therapist_id not in matrices.therapist_index:
             raise TherapistNotFoundError(
                 f"Therapist '{therapist_id}' not found in constraint matrices. "
                 f"Available therapists: {', '.join(map(str, matrices.therapist_ids[:5]))}..."
             )
         
-        assignments = data_store.load_schedule().assignments
+        assignments = schedule.assignments
         therapists_df = data_store.load_normalized_therapists()
         prescriptions_df = data_store.load_normalized_prescriptions()
         
         if patient_id:
-            assignments = [a for a in assignments if a.patient_id == patient_id]
-        
-        if therapist_id:
-            assignments = [a for a in assignments if a.therapist_id == therapist_id]
+            assignments = schedule.by_patient.get(patient_id, [])
+            if therapist_id:
+                assignments = [a for a in assignments if a.therapist_id == therapist_id]
+        elif therapist_id:
+            assignments = schedule.by_therapist.get(therapist_id, [])
         
         # Enrich assignments with attributes
-        enriched_assignments = []
-        for a in assignments:
-            assignment_data = {
+        patient_attributes = _attribute_lookup(
+            prescriptions_df, '患者ID', {a.patient_id for a in assignments}, {
+                '氏名': "patient_name",
+                '病棟': "patient_ward",
+                '担当療法士': "primary_therapist",
+                '算定区分': "category",
+            }
+        )
+        therapist_attributes = _attribute_lookup(
+            therapists_df, '職員ID', {a.therapist_id for a in assignments}, {
+                '漢字氏名': "therapist_name",
+                '性別': "therapist_gender",
+                '職種': "therapist_profession",
+                '担当病棟': "therapist_ward",
+            }
+        )
+        
+        enriched_assignments = [
+            {
                 "patient_id": a.patient_id,
                 "therapist_id": a.therapist_id,
                 "timeslot": a.timeslot,
                 "duration_minutes": a.duration_minutes,
+                **patient_attributes.get(a.patient_id, {}),
+                **therapist_attributes.get(a.therapist_id, {}),
             }
-            
-            # Add patient attributes
-            patient_row = prescriptions_df[prescriptions_df['患者ID'] == a.patient_id]
-            if not patient_row.empty:
-                assignment_data["patient_name"] = patient_row.iloc[0]['氏名']
-                assignment_data["patient_ward"] = patient_row.iloc[0]['病棟']
-                assignment_data["primary_therapist"] = patient_row.iloc[0]['担当療法士']
-                assignment_data["category"] = patient_row.iloc[0]['算定区分']
-            
-            # Add therapist attributes
-            therapist_row = therapists_df[therapists_df['職員ID'] == a.therapist_id]
-            if not therapist_row.empty:
-                assignment_data["therapist_name"] = therapist_row.iloc[0]['漢字氏名']
-                assignment_data["therapist_gender"] = therapist_row.iloc[0]['性別']
-                assignment_data["therapist_profession"] = therapist_row.iloc[0]['職種']
-                assignment_data["therapist_ward"] = therapist_row.iloc[0]['担当病棟']
-            
-            enriched_assignments.append(assignment_data)
+            for a in assignments
+        ]
         
         return {
             "assignments": enriched_assignments,
@@ -281,17 +282,13 @@ def create_schedule_tools(data_store: DataStore):
         if not schedule:
             raise ScheduleNotAvailableError("No schedule available. Create a schedule first using create_schedule()")
         
-        assignments = schedule.assignments
-        therapist_loads = {}
-        patient_coverage = {}
-        
-        for a in assignments:
-            therapist_loads[a.therapist_id] = therapist_loads.get(a.therapist_id, 0) + 1
-            patient_coverage[a.patient_id] = patient_coverage.get(a.patient_id, 0) + a.duration_minutes
+        df = schedule.assignments_df
+        therapist_loads = df.groupby('therapist_id', sort=False).size().to_dict()
+        patient_coverage = df.groupby('patient_id', sort=False)['duration_minutes'].sum().to_dict()
         
         return {
             "schedule_date": schedule.date,
-            "total_assignments": len(assignments),
+            "total_assignments": len(df),
             "unique_patients": len(patient_coverage),
             "unique_therapists": len(therapist_loads),
             "unscheduled_patients": len(schedule.unscheduled_patients),
@@ -311,25 +308,24 @@ def create_schedule_tools(data_store: DataStore):
         """
         matrices = data_store.load_all_matrices()
         
-        if patient_id not in matrices.patient_ids:
+        if patient_id not in matrices.patient_index:
             raise PatientNotFoundError(
                 f"Patient '{patient_id}' not found in constraint matrices. "
                 f"Available patients: {', '.join(map(str, matrices.patient_ids[:5]))}..."
             )
         
-        idx = matrices.patient_ids.index(patient_id)
+        idx = matrices.patient_index[patient_id]
         available_slots = [
-            matrices.timeslots[i] 
-            for i in range(len(matrices.timeslots)) 
-            if matrices.patient_availability[idx, i] == 1
+            matrices.timeslots[i]
+            for i in np.flatnonzero(matrices.patient_availability[idx] == 1)
         ]
         
         assignments = []
-        if data_store.load_schedule():
+        schedule = data_store.load_schedule()
+        if schedule:
             assignments = [
                 {"therapist": a.therapist_id, "timeslot": a.timeslot, "duration": a.duration_minutes}
-                for a in data_store.load_schedule().assignments 
-                if a.patient_id == patient_id
+                for a in schedule.by_patient.get(patient_id, [])
             ]
         
         return {
@@ -351,25 +347,24 @@ def create_schedule_tools(data_store: DataStore):
         """
         matrices = data_store.load_all_matrices()
         
-        if therapist_id not in matrices.therapist_ids:
+        if therapist_id not in matrices.therapist_index:
             raise TherapistNotFoundError(
                 f"Therapist '{therapist_id}' not found in constraint matrices. "
                 f"Available therapists: {', '.join(map(str, matrices.therapist_ids[:5]))}..."
             )
         
-        idx = matrices.therapist_ids.index(therapist_id)
+        idx = matrices.therapist_index[therapist_id]
         available_slots = [
-            matrices.timeslots[i] 
-            for i in range(len(matrices.timeslots)) 
-            if matrices.therapist_availability[idx, i] == 1
+            matrices.timeslots[i]
+            for i in np.flatnonzero(matrices.therapist_availability[idx] == 1)
         ]
         
         assignments = []
-        if data_store.load_schedule():
+        schedule = data_store.load_schedule()
+        if schedule:
             assignments = [
                 {"patient": a.patient_id, "timeslot": a.timeslot, "duration": a.duration_minutes}
-                for a in data_store.load_schedule().assignments 
-                if a.therapist_id == therapist_id
+                for a in schedule.by_therapist.get(therapist_id, [])
             ]
         
         return {
@@ -394,37 +389,38 @@ def create_schedule_tools(data_store: DataStore):
         """
         matrices = data_store.load_all_matrices()
         
-        if patient_id not in matrices.patient_ids:
+        if patient_id not in matrices.patient_index:
             raise PatientNotFoundError(
                 f"Patient '{patient_id}' not found in constraint matrices. "
                 f"Available patients: {', '.join(map(str, matrices.patient_ids[:5]))}..."
             )
         
-        # Parse timeslots - handle both single and multiple
-        timeslot_list = [slot.strip() for slot in timeslots.split(',')]
+        # Parse timeslots - handle both single and multiple, ignoring repeats
+        timeslot_list = list(dict.fromkeys(slot.strip() for slot in timeslots.split(',')))
         
-        patient_idx = matrices.patient_ids.index(patient_id)
-        changes = []
+        # Validate everything before touching the matrix
+        invalid = [slot for slot in timeslot_list if slot not in matrices.timeslot_index]
+        if invalid:
+            raise InvalidTimeslotError(
+                f"Invalid timeslot {', '.join(map(repr, invalid))}. Must be one of: {', '.join(map(str, matrices.timeslots))}"
+            )
         
-        for timeslot in timeslot_list:
-            if timeslot not in matrices.timeslots:
-                raise InvalidTimeslotError(
-                    f"Invalid timeslot '{timeslot}'. Must be one of: {', '.join(map(str, matrices.timeslots))}"
-                )
-            
-            slot_idx = matrices.timeslots.index(timeslot)
-            old_value = matrices.patient_availability[patient_idx, slot_idx]
-            new_value = 1 if available else 0
-            
-            matrices.patient_availability[patient_idx, slot_idx] = new_value
-            
-            changes.append({
-                "timeslot": timeslot,
-                "old_value": int(old_value),
-                "new_value": new_value
-            })
+        patient_idx = matrices.patient_index[patient_id]
+        slot_indices = np.fromiter(
+            (matrices.timeslot_index[slot] for slot in timeslot_list), dtype=np.intp, count=len(timeslot_list)
+        )
+        new_value = 1 if available else 0
+        
+        # Fancy indexing returns a copy, so old_values survives the write below
+        old_values = matrices.patient_availability[patient_idx, slot_indices]
+        matrices.patient_availability[patient_idx, slot_indices] = new_value
+        
+        changes = [
+            {"timeslot": timeslot, "old_value": old_value, "new_value": new_value}
+            for timeslot, old_value in zip(timeslot_list, old_values.tolist())
+        ]
         
-        data_store.save_all_matrices(matrices)
+        data_store.save_patient_availability(matrices.patient_availability)
         
         return {
             "patient_id": patient_id,
@@ -7,8 +7,13 @@ from ..utils.time_utils import generate_timeslots, parse_unavailable_times, chec
 class ConstraintMatrixBuilder:
     """Pure matrix building - receives data, returns matrices."""
     
-    def __init__(self):
-        self.timeslots = generate_timeslots()
+    # The timeslot grid is fixed, so it is generated once and shared by every builder
+    _TIMESLOTS = tuple(generate_timeslots())
+    _TIMESLOT_INDEX = {slot: j for j, slot in enumerate(_TIMESLOTS)}
+    
+    @property
+    def timeslots(self) -> tuple[str, ...]:
+        return self._TIMESLOTS
     
     def build_matrices(self, therapists: pd.DataFrame, 
                       prescriptions: pd.DataFrame, 
@@ -25,7 +30,7 @@ class ConstraintMatrixBuilder:
             requirements=self.build_requirements(prescriptions, patient_ids),
             patient_ids=patient_ids,
             therapist_ids=therapist_ids,
-            timeslots=self.timeslots
+            timeslots=list(self.timeslots)
         )
     
     def build_patient_availability(self, prescriptions: pd.DataFrame, patient_ids: list[str] = None) -> np.ndarray:
@@ -33,30 +38,30 @@ class ConstraintMatrixBuilder:
         if patient_ids is None:
             patient_ids = prescriptions['患者ID'].unique().tolist()
         
-        matrix = np.ones((len(patient_ids), len(self.timeslots)), dtype=int)
-        
-        for i, patient_id in enumerate(patient_ids):
-            patient = prescriptions[prescriptions['患者ID'] == patient_id].iloc[0]
-            
-            unavailable_slots = []
-            
-            # Parse bathing time
-            if pd.notna(patient.get('入浴')):
-                unavailable_slots.extend(parse_unavailable_times(patient['入浴']))
-            
-            # Parse excretion time
-            if pd.notna(patient.get('排泄')):
-                unavailable_slots.extend(parse_unavailable_times(patient['排泄']))
-            
-            # Parse other unavailable times
-            if pd.notna(patient.get('その他指定時間')):
-                unavailable_slots.extend(parse_unavailable_times(patient['その他指定時間']))
-            
-            # Mark unavailable slots
-            for slot in unavailable_slots:
-                if slot in self.timeslots:
-                    j = self.timeslots.index(slot)
-                    matrix[i, j] = 0
+        matrix = np.ones((len(patient_ids), len(self.timeslots)), dtype=np.int8)
+        
+        # First row per ID, in matrix order
+        patients = prescriptions.drop_duplicates('患者ID').set_index('患者ID').loc[patient_ids]
+        
+        # Collect blocked cells from bathing, excretion and other fixed times, then write once.
+        # The same time strings recur across patients, so each is parsed only once.
+        blocked_cols: dict[str, list[int]] = {}
+        rows, cols = [], []
+        for column in ('入浴', '排泄', 'その他指定時間'):
+            if column not in patients:
+                continue
+            for i, value in enumerate(patients[column]):
+                if pd.isna(value):
+                    continue
+                if value not in blocked_cols:
+                    blocked_cols[value] = [
+                        self._TIMESLOT_INDEX[slot] for slot in parse_unavailable_times(value)
+                        if slot in self._TIMESLOT_INDEX
+                    ]
+                rows.extend([i] * len(blocked_cols[value]))
+                cols.extend(blocked_cols[value])
+        
+        matrix[np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)] = 0
         
         return matrix
     
@@ -67,25 +72,21 @@ class ConstraintMatrixBuilder:
         if therapist_ids is None:
             therapist_ids = therapists['職員ID'].unique().tolist()
         
-        matrix = np.zeros((len(therapist_ids), len(self.timeslots)), dtype=int)
+        # First row per ID / per shift name, in matrix order
+        names = therapists.drop_duplicates('職員ID').set_index('職員ID').loc[therapist_ids, '漢字氏名']
+        shift_rows = shifts.drop_duplicates('therapist_name')
+        code_by_name = dict(zip(shift_rows['therapist_name'], shift_rows['availability']))
+        codes = pd.Series(
+            [None if pd.isna(name) else code_by_name.get(name) for name in names], dtype=object
+        )
         
-        for i, therapist_id in enumerate(therapist_ids):
-            # Find therapist name
-            therapist_name = therapists[therapists['職員ID'] == therapist_id]['漢字氏名'].iloc[0]
-            
-            # Find shift entry
-            shift_entry = shifts[shifts['therapist_name'] == therapist_name]
-            if shift_entry.empty:
-                continue
-            
-            availability_code = shift_entry.iloc[0]['availability']
-            
-            # Check each timeslot
-            for j, slot in enumerate(self.timeslots):
-                if check_shift_availability(availability_code, slot):
-                    matrix[i, j] = 1
+        # Evaluate each distinct shift code once; therapists without a code get the trailing zero row
+        labels, distinct_codes = pd.factorize(codes)
+        code_rows = np.zeros((len(distinct_codes) + 1, len(self.timeslots)), dtype=np.int8)
+        for k, code in enumerate(distinct_codes):
+            code_rows[k] = [check_shift_availability(code, slot) for slot in self.timeslots]
         
-        return matrix
+        return code_rows[labels]
     
     def build_compatibility(self, therapists: pd.DataFrame, 
                           prescriptions: pd.DataFrame,
@@ -97,45 +98,42 @@ class ConstraintMatrixBuilder:
         if therapist_ids is None:
             therapist_ids = therapists['職員ID'].unique().tolist()
         
-        matrix = np.zeros((len(patient_ids), len(therapist_ids)), dtype=int)
+        # First row per ID, in matrix order
+        patients = prescriptions.drop_duplicates('患者ID').set_index('患者ID').loc[patient_ids]
+        therapist_rows = therapists.drop_duplicates('職員ID').set_index('職員ID')
+        staff = therapist_rows.loc[therapist_ids]
         
-        # Create name to ID mapping
+        # Resolve each patient's primary therapist to an ID, its column and its gender
         name_to_id = dict(zip(therapists['漢字氏名'], therapists['職員ID']))
+        gender_by_id = therapist_rows['性別'].to_dict()
+        therapist_index = {therapist_id: j for j, therapist_id in enumerate(therapist_ids)}
+        primary_names = patients['担当療法士'] if '担当療法士' in patients else [None] * len(patients)
+        primary_ids = [name_to_id.get(name) for name in primary_names]
+        primary_cols = np.array([therapist_index.get(pid, -1) if pid else -1 for pid in primary_ids], dtype=np.intp)
+        primary_genders = [gender_by_id.get(pid) if pid else None for pid in primary_ids]
         
-        for i, patient_id in enumerate(patient_ids):
-            patient = prescriptions[prescriptions['患者ID'] == patient_id].iloc[0]
-            patient_ward = patient['病棟']
-            primary_therapist_name = patient.get('担当療法士')
-            
-            # Get primary therapist info
-            primary_therapist_id = name_to_id.get(primary_therapist_name)
-            primary_gender = None
-            if primary_therapist_id:
-                primary_info = therapists[therapists['職員ID'] == primary_therapist_id]
-                if not primary_info.empty:
-                    primary_gender = primary_info.iloc[0]['性別']
-            
-            for j, therapist_id in enumerate(therapist_ids):
-                therapist = therapists[therapists['職員ID'] == therapist_id].iloc[0]
-                
-                # Check 専従 constraint FIRST (overrides everything)
-                if therapist['専従'] and therapist['担当病棟'] != patient_ward:
-                    matrix[i, j] = 0
-                    continue
-                
-                # Primary therapist
-                if therapist_id == primary_therapist_id:
-                    matrix[i, j] = 100
-                    continue
-                
-                # Calculate compatibility score
-                score = 20
-                if therapist['担当病棟'] == patient_ward:
-                    score += 20
-                if primary_gender and therapist['性別'] == primary_gender:
-                    score += 40
-                
-                matrix[i, j] = score
+        # Compare wards and genders as shared integer codes; missing values never match
+        ward_codes = pd.factorize(np.concatenate([patients['病棟'].to_numpy(object),
+                                                  staff['担当病棟'].to_numpy(object)]))[0]
+        p_ward, t_ward = ward_codes[:len(patient_ids)], ward_codes[len(patient_ids):]
+        ward_eq = (p_ward[:, None] == t_ward[None, :]) & (p_ward[:, None] >= 0)
+        
+        gender_codes = pd.factorize(np.array(
+            [gender if gender else None for gender in primary_genders] + staff['性別'].tolist(), dtype=object
+        ))[0]
+        p_gender, t_gender = gender_codes[:len(patient_ids)], gender_codes[len(patient_ids):]
+        gender_eq = (p_gender[:, None] == t_gender[None, :]) & (p_gender[:, None] >= 0)
+        
+        # Scores are at most 100, so int8 is enough
+        matrix = (20 + 20 * ward_eq + 40 * gender_eq).astype(np.int8)
+        
+        # Primary therapist
+        has_primary = primary_cols >= 0
+        matrix[np.flatnonzero(has_primary), primary_cols[has_primary]] = 100
+        
+        # 専従 therapists outside the patient's ward are blocked, overriding everything
+        exclusive = staff['専従'].to_numpy().astype(bool)
+        matrix[~ward_eq & exclusive[None, :]] = 0
         
         return matrix
     
@@ -144,15 +142,10 @@ class ConstraintMatrixBuilder:
         if patient_ids is None:
             patient_ids = prescriptions['患者ID'].unique().tolist()
         
-        requirements = np.zeros(len(patient_ids), dtype=int)
-        
-        for i, patient_id in enumerate(patient_ids):
-            patient = prescriptions[prescriptions['患者ID'] == patient_id].iloc[0]
-            therapy_type = patient.get('算定区分', '')
-            
-            if '脳血管疾患' in str(therapy_type):
-                requirements[i] = 180
-            else:
-                requirements[i] = 120
+        # 脳血管疾患 prescriptions need 180 minutes, everything else 120
+        patients = prescriptions.drop_duplicates('患者ID').set_index('患者ID').loc[patient_ids]
+        if '算定区分' not in patients:
+            return np.full(len(patient_ids), 120, dtype=np.int16)
         
-        return requirements
+        cerebrovascular = patients['算定区分'].astype(str).str.contains('脳血管疾患', regex=False, na=False)
+        return np.where(cerebrovascular.to_numpy(dtype=bool), 180, 120).astype(np.int16)
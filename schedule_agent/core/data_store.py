@@ -1,9 +1,12 @@
+import copy
+import os
 import tempfile
 import shutil
 import pandas as pd
 import numpy as np
+import openpyxl
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 from contextlib import contextmanager
 import json
 import base64
@@ -13,11 +16,19 @@ from ..models.data_models import ConstraintMatrices, Schedule
 class DataStore:
     """Unified data storage with session safety and file-specific operations."""
     
+    # Columns the pipeline and tools read; other columns in the uploads are skipped
+    THERAPIST_COLUMNS = frozenset({'職員ID', '漢字氏名', '性別', '職種', '担当病棟', '専従'})
+    PRESCRIPTION_COLUMNS = frozenset({
+        '患者ID', '氏名', '病棟', '担当療法士', '算定区分', '入浴', '排泄', 'その他指定時間'
+    })
+    
     def __init__(self, therapist_file: str = "therapist.csv", 
                  prescription_file: str = "prescription.csv",
                  shift_file: str = "shift.xlsx") -> None:
         self._temp_dir: Optional[Path] = None
         self._session_active: bool = False
+        # Parsed files, dropped whenever DataStore rewrites them
+        self._cache: dict[Path, Any] = {}
         
         # Configurable file names
         self.therapist_file = therapist_file
@@ -44,6 +55,7 @@ class DataStore:
         """Clean up only if session is active."""
         if self._session_active and self._temp_dir and self._temp_dir.exists():
             shutil.rmtree(self._temp_dir)
+            self._cache.clear()
             self._temp_dir = None
             self._session_active = False
     
@@ -69,7 +81,17 @@ class DataStore:
         
         dest_name = target_name or source.name
         dest = self._temp_dir / "raw" / dest_name
-        shutil.copy2(source, dest)
+        # Inputs are only read, so a hard link is enough when source and session share a filesystem.
+        # Unlink first so a re-copy never writes through a link into someone else's file.
+        if dest.exists() and dest.samefile(source):
+            self._cache.pop(dest, None)
+            return dest
+        dest.unlink(missing_ok=True)
+        try:
+            os.link(source, dest)
+        except OSError:
+            shutil.copy2(source, dest)
+        self._cache.pop(dest, None)
         return dest
     
     # Base64 File Reading (for AgentCore payload)
@@ -131,34 +153,43 @@ class DataStore:
             except UnicodeDecodeError:
                 return 'cp932'
     
+    def _excel_engine(self) -> Optional[str]:
+        """Use the native calamine reader when installed, else pandas' default (openpyxl)."""
+        try:
+            import python_calamine  # noqa: F401
+            return 'calamine'
+        except ImportError:
+            return None
+    
     def load_therapists(self) -> pd.DataFrame:
         path = self._temp_dir / "raw" / self.therapist_file
         encoding = self._detect_encoding(path)
-        return pd.read_csv(path, encoding=encoding, dtype={'職員ID': str})
+        return pd.read_csv(path, encoding=encoding, dtype={'職員ID': str},
+                           usecols=lambda column: column in self.THERAPIST_COLUMNS)
     
     def load_prescriptions(self) -> pd.DataFrame:
         path = self._temp_dir / "raw" / self.prescription_file
         encoding = self._detect_encoding(path)
-        return pd.read_csv(path, encoding=encoding, dtype={'患者ID': str})
+        return pd.read_csv(path, encoding=encoding, dtype={'患者ID': str},
+                           usecols=lambda column: column in self.PRESCRIPTION_COLUMNS)
     
     def load_shifts(self) -> pd.DataFrame:
+        # Parsing the workbook is slow, so reruns for another date reuse it
         path = self._temp_dir / "raw" / self.shift_file
-        return pd.read_excel(path, header=1)
+        return self._cached(path, lambda p: pd.read_excel(p, header=1, engine=self._excel_engine())).copy()
     
     # Normalized Data Operations
     def save_normalized_therapists(self, data: pd.DataFrame) -> None:
         self._save_interim_csv(data, "normalized_therapists.csv")
     
     def load_normalized_therapists(self) -> pd.DataFrame:
-        path = self._temp_dir / "interim" / "normalized_therapists.csv"
-        return pd.read_csv(path, dtype={'職員ID': str})
+        return self._load_interim_csv("normalized_therapists.csv", dtype={'職員ID': str})
     
     def save_normalized_prescriptions(self, data: pd.DataFrame) -> None:
         self._save_interim_csv(data, "normalized_prescriptions.csv")
     
     def load_normalized_prescriptions(self) -> pd.DataFrame:
-        path = self._temp_dir / "interim" / "normalized_prescriptions.csv"
-        return pd.read_csv(path, dtype={'患者ID': str})
+        return self._load_interim_csv("normalized_prescriptions.csv", dtype={'患者ID': str})
     
     def save_normalized_shifts(self, data: pd.DataFrame) -> None:
         self._save_interim_csv(data, "normalized_shifts.csv")
@@ -237,11 +268,16 @@ class DataStore:
         import pickle
         with open(schedule_file, 'wb') as f:
             pickle.dump(schedule, f)
+        self._cache.pop(schedule_file, None)
         
         return schedule_file
     
     def load_schedule(self):
-        """Load current schedule from pickle file."""
+        """Load current schedule from pickle file.
+        
+        Returns a fresh copy each call, so callers may modify it without
+        affecting later loads.
+        """
         if not self._temp_dir:
             raise RuntimeError("Session not initialized")
         
@@ -250,9 +286,18 @@ class DataStore:
         if not schedule_file.exists():
             return None
         
-        import pickle
-        with open(schedule_file, 'rb') as f:
-            return pickle.load(f)
+        def load(path: Path) -> Schedule:
+            import pickle
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        
+        schedule = self._cached(schedule_file, load)
+        # Rebuild rather than copy.copy so the cached views are not carried over
+        return Schedule(
+            assignments=[copy.copy(a) for a in schedule.assignments],
+            date=schedule.date,
+            unscheduled_patients=list(schedule.unscheduled_patients)
+        )
     
     def has_schedule(self) -> bool:
         """Check if current schedule exists."""
@@ -260,7 +305,8 @@ class DataStore:
             return False
         
         schedule_file = self._temp_dir / "processed" / "current_schedule.pkl"
-        return schedule_file.exists()
+        # A cached load implies the file is there, so skip the stat
+        return schedule_file in self._cache or schedule_file.exists()
     
     def save_error_state(self, error_data: dict) -> None:
         self._save_interim_json(error_data, "error_state.json")
@@ -272,31 +318,46 @@ class DataStore:
     def _save_interim_csv(self, data: pd.DataFrame, filename: str) -> Path:
         path = self._temp_dir / "interim" / filename
         data.to_csv(path, index=False, encoding="utf-8")
+        self._cache.pop(path, None)
         return path
     
     def _save_interim_numpy(self, data: np.ndarray, filename: str) -> Path:
         path = self._temp_dir / "interim" / filename
         np.save(path, data)
+        self._cache.pop(path, None)
         return path
     
     def _save_processed_excel(self, data: pd.DataFrame, filename: str) -> Path:
         path = self._temp_dir / "processed" / filename
-        data.to_excel(path, index=False)
+        # Stream rows through a write-only workbook instead of building the full cell model
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        sheet.append(list(data.columns))
+        for row in data.astype(object).where(data.notna(), None).itertuples(index=False):
+            sheet.append(row)
+        workbook.save(path)
+        self._cache.pop(path, None)
         return path
     
     def _save_interim_json(self, data: Any, filename: str) -> Path:
         path = self._temp_dir / "interim" / filename
         with open(path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False)
         return path
     
-    def _load_interim_csv(self, filename: str) -> pd.DataFrame:
+    def _load_interim_csv(self, filename: str, dtype: Optional[dict] = None) -> pd.DataFrame:
         path = self._temp_dir / "interim" / filename
-        return pd.read_csv(path)
+        return self._cached(path, lambda p: pd.read_csv(p, dtype=dtype)).copy()
     
     def _load_interim_numpy(self, filename: str) -> np.ndarray:
         path = self._temp_dir / "interim" / filename
-        return np.load(path)
+        return self._cached(path, np.load).copy()
+    
+    def _cached(self, path: Path, load: Callable[[Path], Any]) -> Any:
+        """Parse path on first access and reuse the result until it is rewritten."""
+        if path not in self._cache:
+            self._cache[path] = load(path)
+        return self._cache[path]
     
     def _load_interim_json(self, filename: str) -> dict:
         path = self._temp_dir / "interim" / filename
@@ -305,12 +366,9 @@ class DataStore:
     
     def _schedule_to_dataframe(self, schedule: Schedule) -> pd.DataFrame:
         """Convert Schedule object to DataFrame for Excel export."""
-        data = []
-        for assignment in schedule.assignments:
-            data.append({
-                'Patient ID': assignment.patient_id,
-                'Therapist ID': assignment.therapist_id,
-                'Time Slot': assignment.timeslot,
-                'Duration (min)': assignment.duration_minutes
-            })
-        return pd.DataFrame(data)
+        return schedule.assignments_df.rename(columns={
+            'patient_id': 'Patient ID',
+            'therapist_id': 'Therapist ID',
+            'timeslot': 'Time Slot',
+            'duration_minutes': 'Duration (min)'
+        })
@@ -2,7 +2,8 @@ from .data_store import DataStore
 from .preprocessor import DataNormalizer
 from .constraints_builder import ConstraintMatrixBuilder
 from .scheduler import DeterministicScheduler
-from ..models.data_models import Schedule
+from ..models.data_models import ConstraintMatrices, Schedule
+import pandas as pd
 
 
 class SchedulingPipeline:
@@ -15,20 +16,23 @@ class SchedulingPipeline:
         self.scheduler = DeterministicScheduler()
     
     # Granular operations
-    def preprocess_therapists(self) -> None:
+    def preprocess_therapists(self) -> pd.DataFrame:
         therapists = self.store.load_therapists()
         normalized = self.normalizer.normalize_therapists(therapists)
         self.store.save_normalized_therapists(normalized)
+        return normalized
     
-    def preprocess_prescriptions(self) -> None:
+    def preprocess_prescriptions(self) -> pd.DataFrame:
         prescriptions = self.store.load_prescriptions()
         normalized = self.normalizer.normalize_prescriptions(prescriptions)
         self.store.save_normalized_prescriptions(normalized)
+        return normalized
     
-    def preprocess_shifts(self, target_date: str) -> None:
+    def preprocess_shifts(self, target_date: str) -> pd.DataFrame:
         shifts = self.store.load_shifts()
         normalized = self.normalizer.normalize_shifts(shifts, target_date)
         self.store.save_normalized_shifts(normalized)
+        return normalized
     
     def build_patient_constraints(self) -> None:
         prescriptions = self.store.load_normalized_prescriptions()
@@ -53,31 +57,42 @@ class SchedulingPipeline:
         self.store.save_requirements_vector(vector)
     
     # Complete operations
-    def preprocess_all(self, target_date: str) -> None:
-        self.preprocess_therapists()
-        self.preprocess_prescriptions()
-        self.preprocess_shifts(target_date)
+    def preprocess_all(self, target_date: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        return (
+            self.preprocess_therapists(),
+            self.preprocess_prescriptions(),
+            self.preprocess_shifts(target_date),
+        )
     
     def build_all_constraints(self) -> None:
         therapists = self.store.load_normalized_therapists()
         prescriptions = self.store.load_normalized_prescriptions()
         shifts = self.store.load_normalized_shifts()
         
+        self.build_all_constraints_from(therapists, prescriptions, shifts)
+    
+    def build_all_constraints_from(self, therapists: pd.DataFrame, prescriptions: pd.DataFrame,
+                                   shifts: pd.DataFrame) -> ConstraintMatrices:
         matrices = self.builder.build_matrices(therapists, prescriptions, shifts)
         self.store.save_all_matrices(matrices)
+        return matrices
     
     def schedule(self, date: str) -> Schedule:
         matrices = self.store.load_all_matrices()
+        return self._schedule_matrices(matrices, date)
+    
+    def full_pipeline(self, date: str, load: bool = False) -> Schedule:
+        if load:
+            # Skip preprocessing and constraint building, use existing matrices
+            return self.schedule(date)
+        
+        # Fresh creation: hand normalized data and matrices straight to the
+        # next step instead of reading back what was just saved
+        matrices = self.build_all_constraints_from(*self.preprocess_all(date))
+        return self._schedule_matrices(matrices, date)
+    
+    def _schedule_matrices(self, matrices: ConstraintMatrices, date: str) -> Schedule:
         schedule = self.scheduler.schedule(matrices)
         schedule.date = date
         self.store.save_schedule(schedule)
         return schedule
-    
-    def full_pipeline(self, date: str, load: bool = False) -> Schedule:
-        if not load:
-            # Fresh creation: preprocess and build constraints
-            self.preprocess_all(date)
-            self.build_all_constraints()
-        # For load=True: skip preprocessing and constraint building, use existing matrices
-        
-        return self.schedule(date)
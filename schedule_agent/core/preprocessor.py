@@ -1,3 +1,4 @@
+import re
 import pandas as pd
 
 
@@ -10,14 +11,22 @@ class DataNormalizer:
         '5階東病棟': '5E', '5階西病棟': '5W'
     }
     
+    # Leading day number of a shift column, followed by newline or _x000D_
+    DAY_COLUMN_PATTERN = re.compile(r'(\d+)[\n_]')
+    
     def normalize_therapists(self, therapists: pd.DataFrame) -> pd.DataFrame:
-        normalized = therapists.copy()
-        normalized['専従'] = normalized['専従'] == '〇'
-        return normalized
+        """Normalize therapists; one row per 職員ID (latest record wins)."""
+        therapists = therapists.drop_duplicates('職員ID', keep='last')
+        # assign() only replaces the changed column; the input is left untouched
+        return therapists.assign(**{'専従': therapists['専従'] == '〇'})
     
     def normalize_prescriptions(self, prescriptions: pd.DataFrame) -> pd.DataFrame:
-        normalized = prescriptions.copy()
-        normalized['病棟'] = normalized['病棟'].map(self.WARD_MAP)
+        """Normalize prescriptions; one row per 患者ID (latest record wins)."""
+        prescriptions = prescriptions.drop_duplicates('患者ID', keep='last')
+        # Map via categories so each distinct ward name is looked up once
+        normalized = prescriptions.assign(
+            **{'病棟': prescriptions['病棟'].astype('category').map(self.WARD_MAP)}
+        )
         return self._normalize_time_formats(normalized)
     
     def normalize_shifts(self, shifts: pd.DataFrame, target_date: str) -> pd.DataFrame:
@@ -29,16 +38,12 @@ class DataNormalizer:
         
         # Find column that contains the day number
         # Format is like " 1\n水" or " 1_x000D_\n水"
-        date_col = None
-        for col in df.columns[4:]:
-            col_str = str(col).strip()
-            # Handle both formats: with newline and with _x000D_
-            if (col_str.startswith(f' {day}\n') or 
-                col_str.startswith(f'{day}\n') or
-                col_str.startswith(f' {day}_') or
-                col_str.startswith(f'{day}_')):
-                date_col = col
-                break
+        date_col = next(
+            (col for col in df.columns[4:]
+             if (match := self.DAY_COLUMN_PATTERN.match(str(col).strip()))
+             and match.group(1) == day),
+            None
+        )
         
         if date_col is None:
             raise ValueError(f"Date {target_date} (day {day}) not found in shift data")
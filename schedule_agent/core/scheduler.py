@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 from ..models.data_models import (
     ConstraintMatrices,
     Schedule,
@@ -16,12 +17,26 @@ class DeterministicScheduler:
         assignments = []
         unscheduled = []
         
-        # Create working copies
-        patient_avail = matrices.patient_availability.copy()
-        therapist_avail = matrices.therapist_availability.copy()
-        
-        # Sort patients by required minutes (180-min first)
-        patient_order = np.argsort(-matrices.requirements)
+        # Create working copy as a boolean mask; only therapist availability
+        # changes between patients, so each patient's available slots are
+        # extracted once up front
+        therapist_avail = matrices.therapist_availability == 1
+        # Busy slots per therapist, kept up to date as slots are assigned
+        therapist_load = np.count_nonzero(~therapist_avail, axis=1)
+        # Cost matrix buffer shared by all patients, sized for the worst case
+        cost_buffer = np.empty(therapist_avail.shape[::-1], dtype=np.int16)
+        rows, slots = np.nonzero(matrices.patient_availability == 1)
+        slot_counts = np.bincount(rows, minlength=len(matrices.patient_ids))
+        patient_slots = np.split(slots, np.cumsum(slot_counts)[:-1])
+        
+        # Order patients by required minutes (180-min first); requirements take
+        # only a few distinct values, so bucket them instead of a full sort.
+        # Ties keep patient order.
+        buckets = [
+            np.flatnonzero(matrices.requirements == minutes)
+            for minutes in np.unique(matrices.requirements)[::-1]
+        ]
+        patient_order = np.concatenate(buckets) if buckets else []
         
         for patient_idx in patient_order:
             patient_id = matrices.patient_ids[patient_idx]
@@ -32,8 +47,10 @@ class DeterministicScheduler:
                 patient_assignments = self._assign_patient(
                     patient_idx,
                     required_slots,
-                    patient_avail,
+                    patient_slots[patient_idx],
                     therapist_avail,
+                    therapist_load,
+                    cost_buffer,
                     matrices
                 )
                 assignments.extend(patient_assignments)
@@ -50,79 +67,120 @@ class DeterministicScheduler:
         self,
         patient_idx: int,
         required_slots: int,
-        patient_avail: np.ndarray,
+        available_slots: np.ndarray,
         therapist_avail: np.ndarray,
+        therapist_load: np.ndarray,
+        cost_buffer: np.ndarray,
         matrices: ConstraintMatrices
     ) -> list[Assignment]:
         """Assign timeslots for a single patient."""
         patient_id = matrices.patient_ids[patient_idx]
         
-        # Get patient's available slots
-        available_slots = np.where(patient_avail[patient_idx] == 1)[0]
-        
         if len(available_slots) < required_slots:
             raise InfeasibleScheduleError(
                 f"Patient {patient_id} needs {required_slots} slots but only {len(available_slots)} available",
                 patient_id=patient_id
             )
         
-        # Build cost matrix for this patient
-        # Rows: timeslots, Columns: therapists
         # Cost = -compatibility + workload_penalty (5 points per assignment)
-        therapist_assignments = np.sum(1 - therapist_avail, axis=1)
-        workload_penalty = therapist_assignments * 5
-        
-        cost_matrix = np.zeros((len(available_slots), len(matrices.therapist_ids)))
-        
-        for i, slot_idx in enumerate(available_slots):
-            for j, therapist_id in enumerate(matrices.therapist_ids):
-                if therapist_avail[j, slot_idx] == 1:
-                    compatibility = matrices.compatibility[patient_idx, j]
-                    if compatibility > 0:
-                        cost_matrix[i, j] = -compatibility + workload_penalty[j]
-                    else:
-                        cost_matrix[i, j] = 1000  # Incompatible
-                else:
-                    cost_matrix[i, j] = 1000  # Therapist not available
-        
-        # Find optimal assignment
-        assignments = []
-        assigned_slots = 0
-        
-        # Greedy approach: assign best therapist-slot pairs
-        while assigned_slots < required_slots:
-            if cost_matrix.min() >= 1000:
-                raise InfeasibleScheduleError(
-                    f"Cannot find therapist for patient {patient_id}",
-                    patient_id=patient_id
-                )
-            
-            # Find best slot-therapist pair
-            slot_i, therapist_j = np.unravel_index(cost_matrix.argmin(), cost_matrix.shape)
-            slot_idx = available_slots[slot_i]
-            therapist_id = matrices.therapist_ids[therapist_j]
-            timeslot = matrices.timeslots[slot_idx]
-            
-            # Create assignment
-            assignments.append(Assignment(
+        workload_penalty = therapist_load * 5
+        
+        # Only therapists with non-zero compatibility can take this patient,
+        # so gather availability for those columns alone
+        compatibility = matrices.compatibility[patient_idx]
+        candidates = np.flatnonzero(compatibility > 0)
+        
+        solution = _assign_slots(
+            required_slots,
+            therapist_avail[np.ix_(candidates, available_slots)].T,
+            compatibility[candidates],
+            workload_penalty[candidates],
+            cost_buffer
+        )
+        if solution is None:
+            raise InfeasibleScheduleError(
+                f"Cannot find therapist for patient {patient_id}",
+                patient_id=patient_id
+            )
+        slot_rows, therapist_cols = solution
+        therapist_cols = candidates[therapist_cols]
+        
+        slot_indices = available_slots[slot_rows]
+        
+        # Update availability
+        therapist_avail[therapist_cols, slot_indices] = False
+        np.add.at(therapist_load, therapist_cols, 1)
+        
+        assignments = [
+            Assignment(
                 patient_id=patient_id,
-                therapist_id=therapist_id,
-                timeslot=timeslot,
+                therapist_id=matrices.therapist_ids[therapist_j],
+                timeslot=matrices.timeslots[slot_idx],
                 duration_minutes=20
-            ))
-            
-            # Update availability
-            patient_avail[patient_idx, slot_idx] = 0
-            therapist_avail[therapist_j, slot_idx] = 0
-            
-            # Mark this slot-therapist pair as used
-            cost_matrix[slot_i, :] = 1000
-            
-            assigned_slots += 1
+            )
+            for slot_idx, therapist_j in zip(slot_indices, therapist_cols)
+        ]
         
         return assignments
 
 
+def _assign_slots(
+    required_slots: int,
+    slot_avail: np.ndarray,
+    compatibility: np.ndarray,
+    workload_penalty: np.ndarray,
+    cost_buffer: np.ndarray
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Pick the cheapest slot-therapist pairs for one patient.
+    
+    Works on plain arrays only: slot_avail is a (slots, therapists) boolean
+    mask, compatibility and workload_penalty are per therapist. cost_buffer is
+    an int16 scratch array at least as large as slot_avail. Returns
+    (slot rows, therapist columns), or None if required_slots pairs cannot
+    be assigned.
+    """
+    # Rows: timeslots, Columns: therapists
+    # Costs stay within [-100, 1000], so int16 keeps the matrix compact
+    compatibility = compatibility.astype(np.int16)
+    workload_penalty = workload_penalty.astype(np.int16)
+    
+    # Incompatible or unavailable therapist-slot pairs cost 1000
+    feasible = slot_avail & (compatibility > 0)
+    cost_matrix = cost_buffer[:slot_avail.shape[0], :slot_avail.shape[1]]
+    cost_matrix.fill(1000)
+    np.copyto(cost_matrix, -compatibility + workload_penalty, where=feasible)
+    
+    # Only slots and therapists with at least one feasible pair can take
+    # part in the assignment, so drop the rest before solving
+    slot_rows = np.flatnonzero(feasible.any(axis=1))
+    therapist_cols = np.flatnonzero(feasible.any(axis=0))
+    
+    if len(slot_rows) < required_slots:
+        return None
+    
+    # Solve the slot selection as a single assignment problem: every
+    # therapist gets one column per required slot so it can cover several
+    # of the patient's slots, and the extra "skip" columns (cheaper than
+    # any real pair) absorb the slots that stay unassigned.
+    reduced = cost_matrix[np.ix_(slot_rows, therapist_cols)]
+    n_slots, n_therapists = reduced.shape
+    skip_cost = reduced.min(initial=0) - 1
+    expanded = np.hstack([
+        np.repeat(reduced, required_slots, axis=1),
+        np.full((n_slots, n_slots - required_slots), skip_cost),
+    ])
+    row_ind, col_ind = linear_sum_assignment(expanded)
+    
+    chosen = col_ind < n_therapists * required_slots
+    slot_rows = slot_rows[row_ind[chosen]]
+    therapist_cols = therapist_cols[col_ind[chosen] // required_slots]
+    
+    if len(slot_rows) < required_slots or not feasible[slot_rows, therapist_cols].all():
+        return None
+    
+    return slot_rows, therapist_cols
+
+
 class ScheduleValidator:
     """Validate schedule meets all constraints."""
     
@@ -130,24 +188,42 @@ class ScheduleValidator:
         """Validate schedule against constraints."""
         errors = []
         
+        assignments = schedule.assignments
+        
         # Check each patient has required minutes
-        patient_minutes = {}
-        for assignment in schedule.assignments:
-            patient_minutes[assignment.patient_id] = patient_minutes.get(assignment.patient_id, 0) + 20
-        
-        for i, patient_id in enumerate(matrices.patient_ids):
-            required = matrices.requirements[i]
-            actual = patient_minutes.get(patient_id, 0)
-            if actual < required:
-                errors.append(f"Patient {patient_id}: needs {required}min, got {actual}min")
-        
-        # Check no double-booking
-        therapist_slots = {}
-        for assignment in schedule.assignments:
-            key = (assignment.therapist_id, assignment.timeslot)
-            if key in therapist_slots:
-                errors.append(f"Double booking: {assignment.therapist_id} at {assignment.timeslot}")
-            therapist_slots[key] = True
+        patient_idx = np.fromiter(
+            (matrices.patient_index.get(a.patient_id, -1) for a in assignments),
+            dtype=np.intp, count=len(assignments)
+        )
+        patient_minutes = np.bincount(
+            patient_idx[patient_idx >= 0], minlength=len(matrices.patient_ids)
+        ) * 20
+        
+        for i in np.flatnonzero(patient_minutes < matrices.requirements):
+            errors.append(
+                f"Patient {matrices.patient_ids[i]}: needs {matrices.requirements[i]}min, "
+                f"got {patient_minutes[i]}min"
+            )
+        
+        # Check no double-booking: every repeat of a (therapist, timeslot)
+        # pair after its first occurrence is an error. IDs missing from the
+        # matrices get fresh codes so they are still compared exactly.
+        therapist_index = {therapist_id: i for i, therapist_id in enumerate(matrices.therapist_ids)}
+        slot_index = {timeslot: i for i, timeslot in enumerate(matrices.timeslots)}
+        therapist_codes = np.fromiter(
+            (therapist_index.setdefault(a.therapist_id, len(therapist_index)) for a in assignments),
+            dtype=np.intp, count=len(assignments)
+        )
+        slot_codes = np.fromiter(
+            (slot_index.setdefault(a.timeslot, len(slot_index)) for a in assignments),
+            dtype=np.intp, count=len(assignments)
+        )
+        _, first_seen = np.unique(therapist_codes * len(slot_index) + slot_codes, return_index=True)
+        repeated = np.ones(len(assignments), dtype=bool)
+        repeated[first_seen] = False
+        
+        for k in np.flatnonzero(repeated):
+            errors.append(f"Double booking: {assignments[k].therapist_id} at {assignments[k].timeslot}")
         
         return ValidationResult(
             is_valid=len(errors) == 0,
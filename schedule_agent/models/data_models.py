@@ -1,6 +1,9 @@
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Optional
 import numpy as np
+import pandas as pd
 
 
 @dataclass
@@ -36,7 +39,7 @@ class TimeSlot:
     time_str: str  # "09:00-09:20"
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     patient_id: str
     therapist_id: str
@@ -49,17 +52,53 @@ class Schedule:
     assignments: list[Assignment]
     date: str
     unscheduled_patients: list[str]
+    
+    # Columnar view of the assignments, built on first use
+    @cached_property
+    def assignments_df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [(a.patient_id, a.therapist_id, a.timeslot, a.duration_minutes) for a in self.assignments],
+            columns=['patient_id', 'therapist_id', 'timeslot', 'duration_minutes']
+        )
+    
+    # ID -> assignments lookups, built on first use
+    @cached_property
+    def by_patient(self) -> dict[str, list[Assignment]]:
+        index = defaultdict(list)
+        for assignment in self.assignments:
+            index[assignment.patient_id].append(assignment)
+        return dict(index)
+    
+    @cached_property
+    def by_therapist(self) -> dict[str, list[Assignment]]:
+        index = defaultdict(list)
+        for assignment in self.assignments:
+            index[assignment.therapist_id].append(assignment)
+        return dict(index)
 
 
 @dataclass
 class ConstraintMatrices:
-    patient_availability: np.ndarray  # (P, 18)
-    therapist_availability: np.ndarray  # (Th, 18)
-    compatibility: np.ndarray  # (P, Th)
-    requirements: np.ndarray  # (P,)
+    patient_availability: np.ndarray  # (P, 18) int8, 0/1
+    therapist_availability: np.ndarray  # (Th, 18) int8, 0/1
+    compatibility: np.ndarray  # (P, Th) int8, scores 0-100
+    requirements: np.ndarray  # (P,) int16, minutes
     patient_ids: list[str]
     therapist_ids: list[str]
     timeslots: list[str]
+    
+    # ID -> row/column lookups, built on first use
+    @cached_property
+    def patient_index(self) -> dict[str, int]:
+        return {patient_id: i for i, patient_id in enumerate(self.patient_ids)}
+    
+    @cached_property
+    def therapist_index(self) -> dict[str, int]:
+        return {therapist_id: i for i, therapist_id in enumerate(self.therapist_ids)}
+    
+    @cached_property
+    def timeslot_index(self) -> dict[str, int]:
+        return {timeslot: i for i, timeslot in enumerate(self.timeslots)}
 
 
 @dataclass
@@ -1,3 +1,5 @@
+import re
+import unicodedata
 
 
 def generate_timeslots() -> list[str]:
@@ -22,6 +24,14 @@ def generate_timeslots() -> list[str]:
     return slots
 
 
+# The grid is fixed, so the parsing helpers share one precomputed copy
+_TIMESLOTS = tuple(generate_timeslots())
+_TIMESLOT_INDEX = {slot: i for i, slot in enumerate(_TIMESLOTS)}
+_SLOT_STARTS = tuple((slot, (int(slot[:2]), int(slot[3:5]))) for slot in _TIMESLOTS)
+
+_TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{2})')
+
+
 def parse_unavailable_times(time_str: str) -> list[str]:
     """Parse unavailable time string to list of timeslots.
     
@@ -31,10 +41,6 @@ def parse_unavailable_times(time_str: str) -> list[str]:
     if not time_str or str(time_str).strip() == '' or str(time_str) == 'nan':
         return []
     
-    import re
-    import unicodedata
-    
-    timeslots = generate_timeslots()
     unavailable = []
     
     # Normalize text (full-width to half-width)
@@ -47,7 +53,7 @@ def parse_unavailable_times(time_str: str) -> list[str]:
     time_part = parts[-1] if parts else time_str
     
     # Extract time patterns like "14:30" or "14:30-15:30"
-    time_patterns = re.findall(r'(\d{1,2}):(\d{2})', time_part)
+    time_patterns = _TIME_PATTERN.findall(time_part)
     
     if not time_patterns:
         return []
@@ -62,11 +68,8 @@ def parse_unavailable_times(time_str: str) -> list[str]:
         end_h, end_m = start_h + 1, start_m
     
     # Find matching timeslots
-    for slot in timeslots:
-        slot_start = slot.split('-')[0]
-        slot_h, slot_m = map(int, slot_start.split(':'))
-        
-        if (start_h, start_m) <= (slot_h, slot_m) < (end_h, end_m):
+    for slot, slot_start in _SLOT_STARTS:
+        if (start_h, start_m) <= slot_start < (end_h, end_m):
             unavailable.append(slot)
     
     return unavailable
@@ -74,11 +77,7 @@ def parse_unavailable_times(time_str: str) -> list[str]:
 
 def timeslot_to_index(timeslot: str) -> int:
     """Convert timeslot string to matrix index."""
-    timeslots = generate_timeslots()
-    try:
-        return timeslots.index(timeslot)
-    except ValueError:
-        return -1
+    return _TIMESLOT_INDEX.get(timeslot, -1)
 
 
 def check_shift_availability(shift_code: str, timeslot: str) -> bool:
@@ -1,6 +1,8 @@
+import numpy as np
+import openpyxl
 import pandas as pd
 from pathlib import Path
-from typing import Type
+from typing import BinaryIO, Type, Union
 from schedule_agent.core.data_store import DataStore
 from schedule_agent.models.data_models import Schedule
 
@@ -8,12 +10,12 @@ from schedule_agent.models.data_models import Schedule
 class ScheduleVisualizer:
     """Generate schedule visualizations."""
     
-    def export_to_excel(self, data_store: Type[DataStore], output_path: Path) -> None:
+    def export_to_excel(self, data_store: Type[DataStore], output_path: Union[Path, BinaryIO]) -> None:
         """Export schedule to Excel format.
         
         Args:
             data_store: DataStore instance to load schedule and data from
-            output_path: Path where Excel file should be saved
+            output_path: Path or binary file object the Excel file is written to
         """
         # Load schedule and data from data_store
         schedule = data_store.load_schedule()
@@ -21,32 +23,22 @@ class ScheduleVisualizer:
         therapists_df = data_store.load_normalized_therapists()
         prescriptions_df = data_store.load_normalized_prescriptions()
         
-        # Create DataFrame from assignments
-        data = []
-        for assignment in schedule.assignments:
-            data.append({
-                '患者ID': assignment.patient_id,
-                '職員ID': assignment.therapist_id,
-                '時間帯': assignment.timeslot,
-                '時間(分)': assignment.duration_minutes
-            })
-        
-        df = pd.DataFrame(data)
+        df = schedule.assignments_df.rename(columns={
+            'patient_id': '患者ID',
+            'therapist_id': '職員ID',
+            'timeslot': '時間帯',
+            'duration_minutes': '時間(分)'
+        })
         
         # Sort by patient and timeslot
         df = df.sort_values(['患者ID', '時間帯'])
         
         # Create pivot table for patient schedule
-        pivot = df.pivot_table(
-            index='患者ID',
-            columns='時間帯',
-            values='職員ID',
-            aggfunc='first'
-        )
-        pivot = pivot[sorted(pivot.columns, key=lambda x: matrices.timeslots.index(x) if x in matrices.timeslots else 999)]
+        pivot = self._pivot_by_timeslot(df, '患者ID', '職員ID', matrices.timeslots)
         
         # Add patient attributes
-        patient_attrs = prescriptions_df[['患者ID', '氏名', '病棟', '担当療法士', '算定区分']].drop_duplicates('患者ID')
+        # Normalized data holds one row per ID, so no deduplication is needed
+        patient_attrs = prescriptions_df[['患者ID', '氏名', '病棟', '担当療法士', '算定区分']]
         pivot_with_attrs = pivot.reset_index().merge(patient_attrs, on='患者ID', how='left')
         # Reorder columns: attributes first, then timeslots
         attr_cols = ['患者ID', '氏名', '病棟', '担当療法士', '算定区分']
@@ -54,53 +46,75 @@ class ScheduleVisualizer:
         pivot_with_attrs = pivot_with_attrs[attr_cols + time_cols]
         
         # Create pivot table for therapist schedule
-        therapist_pivot = df.pivot_table(
-            index='職員ID',
-            columns='時間帯',
-            values='患者ID',
-            aggfunc='first'
-        )
-        therapist_pivot = therapist_pivot[sorted(therapist_pivot.columns, key=lambda x: matrices.timeslots.index(x) if x in matrices.timeslots else 999)]
+        therapist_pivot = self._pivot_by_timeslot(df, '職員ID', '患者ID', matrices.timeslots)
         
         # Add therapist attributes
-        therapist_attrs = therapists_df[['職員ID', '漢字氏名', '性別', '職種', '担当病棟']].drop_duplicates('職員ID')
+        therapist_attrs = therapists_df[['職員ID', '漢字氏名', '性別', '職種', '担当病棟']]
         therapist_pivot_with_attrs = therapist_pivot.reset_index().merge(therapist_attrs, on='職員ID', how='left')
         # Reorder columns: attributes first, then timeslots
         attr_cols = ['職員ID', '漢字氏名', '性別', '職種', '担当病棟']
         time_cols = [c for c in therapist_pivot_with_attrs.columns if c not in attr_cols]
         therapist_pivot_with_attrs = therapist_pivot_with_attrs[attr_cols + time_cols]
         
-        # Write to Excel with multiple sheets
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            # Sheet 1: Detailed assignments
-            df.to_excel(writer, sheet_name='詳細', index=False)
-            
-            # Sheet 2: Patient schedule with attributes
-            pivot_with_attrs.to_excel(writer, sheet_name='患者別スケジュール', index=False)
-            
-            # Sheet 3: Therapist schedule with attributes
-            therapist_pivot_with_attrs.to_excel(writer, sheet_name='職員別スケジュール', index=False)
-            
-            # Sheet 4: Summary
-            summary_data = {
-                '項目': ['総割当数', '患者数', '職員数', '未割当患者数'],
-                '値': [
-                    len(schedule.assignments),
-                    len(matrices.patient_ids),
-                    len(matrices.therapist_ids),
-                    len(schedule.unscheduled_patients)
-                ]
-            }
-            pd.DataFrame(summary_data).to_excel(writer, sheet_name='サマリー', index=False)
+        # Summary
+        summary_df = pd.DataFrame({
+            '項目': ['総割当数', '患者数', '職員数', '未割当患者数'],
+            '値': [
+                len(schedule.assignments),
+                len(matrices.patient_ids),
+                len(matrices.therapist_ids),
+                len(schedule.unscheduled_patients)
+            ]
+        })
+        
+        # Stream sheets row by row instead of building the full cell model
+        workbook = openpyxl.Workbook(write_only=True)
+        self._append_sheet(workbook, '詳細', df)
+        self._append_sheet(workbook, '患者別スケジュール', pivot_with_attrs)
+        self._append_sheet(workbook, '職員別スケジュール', therapist_pivot_with_attrs)
+        self._append_sheet(workbook, 'サマリー', summary_df)
+        workbook.save(output_path)
         
         return output_path
     
+    def _append_sheet(self, workbook: openpyxl.Workbook, sheet_name: str, df: pd.DataFrame) -> None:
+        """Append DataFrame as a new write-only sheet (header row + values, blanks for NaN)."""
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(list(df.columns))
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False):
+            sheet.append(row)
+    
+    def _pivot_by_timeslot(self, df: pd.DataFrame, index: str, values: str,
+                           timeslots: list[str]) -> pd.DataFrame:
+        """Pivot assignments into one row per index value and one column per timeslot.
+        
+        Equivalent to pivot_table(aggfunc='first') with columns in timeslot
+        order, but scatters the values into a grid directly.
+        """
+        # Keep the first value when a cell repeats
+        df = df.drop_duplicates([index, '時間帯'])
+        row_labels, rows = np.unique(df[index].to_numpy(), return_inverse=True)
+        col_labels, cols = np.unique(df['時間帯'].to_numpy(), return_inverse=True)
+        
+        grid = np.full((len(row_labels), len(col_labels)), np.nan, dtype=object)
+        grid[rows, cols] = df[values].to_numpy()
+        
+        slot_index = {t: i for i, t in enumerate(timeslots)}
+        order = sorted(range(len(col_labels)), key=lambda i: slot_index.get(col_labels[i], 999))
+        
+        return pd.DataFrame(
+            grid[:, order],
+            index=pd.Index(row_labels, name=index),
+            columns=pd.Index(col_labels[order], name='時間帯')
+        )
+    
     def generate_mermaid(self, schedule: Schedule, patient_id: str = None) -> str:
         """Generate Mermaid Gantt chart for a patient."""
         if not patient_id and schedule.assignments:
             patient_id = schedule.assignments[0].patient_id
         
-        patient_assignments = [a for a in schedule.assignments if a.patient_id == patient_id]
+        patient_assignments = schedule.by_patient.get(patient_id, [])
         
         lines = [
             "gantt",
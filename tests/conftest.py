@@ -0,0 +1,55 @@
+import pytest
+from pathlib import Path
+from schedule_agent.core.data_store import DataStore
+from schedule_agent.core.preprocessor import DataNormalizer
+from schedule_agent.core.constraints_builder import ConstraintMatrixBuilder
+
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+def _build_matrices(therapist_file: str, prescription_file: str, shift_file: str):
+    """Load, normalize and build constraint matrices from test data files."""
+    store = DataStore()
+    with store.session():
+        store.copy_therapist_file(str(TEST_DATA_DIR / therapist_file))
+        store.copy_prescription_file(str(TEST_DATA_DIR / prescription_file))
+        store.copy_shift_file(str(TEST_DATA_DIR / shift_file))
+        therapists = store.load_therapists()
+        prescriptions = store.load_prescriptions()
+        shifts = store.load_shifts()
+
+    normalizer = DataNormalizer()
+    normalized_therapists = normalizer.normalize_therapists(therapists)
+    normalized_prescriptions = normalizer.normalize_prescriptions(prescriptions)
+    normalized_shifts = normalizer.normalize_shifts(shifts, "2025-10-01")
+
+    builder = ConstraintMatrixBuilder()
+    return builder.build_matrices(normalized_therapists, normalized_prescriptions, normalized_shifts)
+
+
+# The scheduler never modifies its input matrices, so tests can share them
+@pytest.fixture(scope="session")
+def scheduler_matrices():
+    return _build_matrices(
+        "test_scheduler_therapist.csv",
+        "test_scheduler_prescription.csv",
+        "test_scheduler_shift.xlsx"
+    )
+
+
+@pytest.fixture(scope="session")
+def scheduler_matrices_blocked():
+    return _build_matrices(
+        "test_scheduler_therapist.csv",
+        "test_constraints_prescription.csv",  # Has blocked times
+        "test_scheduler_shift_blocked.xlsx"
+    )
+
+
+@pytest.fixture(scope="session")
+def scheduler_matrices_afternoon():
+    return _build_matrices(
+        "test_scheduler_therapist.csv",
+        "test_scheduler_prescription.csv",
+        "test_scheduler_shift_afternoon.xlsx"
+    )
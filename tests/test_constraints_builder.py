@@ -4,17 +4,17 @@ from schedule_agent.core.constraints_builder import ConstraintMatrixBuilder
 from schedule_agent.core.data_store import DataStore
 from schedule_agent.core.preprocessor import DataNormalizer
 
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
 
 class TestConstraintMatrixBuilder:
     """Test constraint matrix generation"""
     
     def test_build_patient_availability_matrix(self):
         """TC2.1: Patient availability matrix with blocked slots"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         store = DataStore()
         with store.session():
-            store.copy_prescription_file(str(test_data_dir / "test_constraints_prescription.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_constraints_prescription.csv"))
             prescriptions = store.load_prescriptions()
         
         normalizer = DataNormalizer()
@@ -31,12 +31,10 @@ class TestConstraintMatrixBuilder:
     
     def test_build_therapist_availability_matrix(self):
         """TC2.2: Therapist availability with shift codes"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_constraints_therapist.csv"))
-            store.copy_shift_file(str(test_data_dir / "test_constraints_shift.xlsx"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_constraints_therapist.csv"))
+            store.copy_shift_file(str(TEST_DATA_DIR / "test_constraints_shift.xlsx"))
             therapists = store.load_therapists()
             shifts = store.load_shifts()
         
@@ -52,12 +50,10 @@ class TestConstraintMatrixBuilder:
     
     def test_build_compatibility_matrix(self):
         """TC2.3: Compatibility scoring"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_constraints_therapist.csv"))
-            store.copy_prescription_file(str(test_data_dir / "test_constraints_prescription.csv"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_constraints_therapist.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_constraints_prescription.csv"))
             therapists = store.load_therapists()
             prescriptions = store.load_prescriptions()
         
@@ -75,12 +71,10 @@ class TestConstraintMatrixBuilder:
     
     def test_exclusive_ward_constraint(self):
         """TC2.4: Exclusive ward constraint blocks incompatible assignments"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_constraints_therapist_exclusive.csv"))
-            store.copy_prescription_file(str(test_data_dir / "test_constraints_prescription_exclusive.csv"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_constraints_therapist_exclusive.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_constraints_prescription_exclusive.csv"))
             therapists = store.load_therapists()
             prescriptions = store.load_prescriptions()
         
@@ -97,11 +91,9 @@ class TestConstraintMatrixBuilder:
     
     def test_build_requirements_vector(self):
         """TC2.5: Requirements based on therapy type"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         store = DataStore()
         with store.session():
-            store.copy_prescription_file(str(test_data_dir / "test_constraints_prescription.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_constraints_prescription.csv"))
             prescriptions = store.load_prescriptions()
         
         normalizer = DataNormalizer()
@@ -7,6 +7,24 @@ from schedule_agent.core.data_store import DataStore
 from schedule_agent.core.pipeline import SchedulingPipeline
 from schedule_agent.models.data_models import ConstraintMatrices
 
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
+
+@pytest.fixture(scope="module")
+def preprocessed_store():
+    """Session with inputs preprocessed and matrices built once for the module."""
+    store = DataStore()
+    
+    with store.session():
+        store.copy_therapist_file(TEST_DATA_DIR / "therapist.csv")
+        store.copy_prescription_file(TEST_DATA_DIR / "prescription.csv")
+        store.copy_shift_file(TEST_DATA_DIR / "shift_test.xlsx")
+        
+        pipeline = SchedulingPipeline(store)
+        pipeline.preprocess_all("2025-10-04")
+        pipeline.build_all_constraints()
+        yield store
+
 
 class TestDataStore:
     """Test DataStore functionality."""
@@ -14,7 +32,7 @@ class TestDataStore:
     @pytest.fixture
     def test_data_dir(self):
         """Return path to test data directory."""
-        return Path(__file__).parent / "data"
+        return TEST_DATA_DIR
     
     def test_session_management(self):
         """Test DataStore session management."""
@@ -100,10 +118,10 @@ class TestDataStore:
         with store.session():
             # Create test matrices
             matrices = ConstraintMatrices(
-                patient_availability=np.array([[1, 0, 1], [0, 1, 1]]),
-                therapist_availability=np.array([[1, 1, 0], [0, 1, 1]]),
-                compatibility=np.array([[100, 60], [80, 100]]),
-                requirements=np.array([180, 120]),
+                patient_availability=np.array([[1, 0, 1], [0, 1, 1]], dtype=np.int8),
+                therapist_availability=np.array([[1, 1, 0], [0, 1, 1]], dtype=np.int8),
+                compatibility=np.array([[100, 60], [80, 100]], dtype=np.int8),
+                requirements=np.array([180, 120], dtype=np.int16),
                 patient_ids=['P001', 'P002'],
                 therapist_ids=['T001', 'T002'],
                 timeslots=['09:00-09:20', '09:20-09:40', '09:40-10:00']
@@ -117,6 +135,8 @@ class TestDataStore:
             np.testing.assert_array_equal(matrices.therapist_availability, loaded.therapist_availability)
             np.testing.assert_array_equal(matrices.compatibility, loaded.compatibility)
             np.testing.assert_array_equal(matrices.requirements, loaded.requirements)
+            assert loaded.patient_availability.dtype == np.int8
+            assert loaded.requirements.dtype == np.int16
             assert matrices.patient_ids == loaded.patient_ids
             assert matrices.therapist_ids == loaded.therapist_ids
             assert matrices.timeslots == loaded.timeslots
@@ -166,6 +186,47 @@ class TestDataStore:
             assert loaded_schedule.assignments[0].patient_id == "P001"
             assert loaded_schedule.assignments[0].therapist_id == "T001"
     
+    def test_cached_loads_follow_saves(self):
+        """Test cached loads return copies and pick up rewritten files."""
+        store = DataStore()
+        with store.session():
+            store.save_patient_availability(np.array([[1, 0]], dtype=np.int8))
+            
+            loaded = store.load_patient_availability()
+            loaded[0, 0] = 0
+            assert store.load_patient_availability()[0, 0] == 1
+            
+            store.save_patient_availability(np.array([[0, 1]], dtype=np.int8))
+            assert store.load_patient_availability().tolist() == [[0, 1]]
+            
+            store.save_normalized_prescriptions(pd.DataFrame({'患者ID': ['001']}))
+            assert store.load_normalized_prescriptions()['患者ID'].tolist() == ['001']
+            store.save_normalized_prescriptions(pd.DataFrame({'患者ID': ['002']}))
+            assert store.load_normalized_prescriptions()['患者ID'].tolist() == ['002']
+    
+    def test_loaded_schedule_is_a_copy(self):
+        """Test changes to a loaded schedule do not leak into later loads."""
+        from schedule_agent.models.data_models import Schedule, Assignment
+        
+        store = DataStore()
+        with store.session():
+            store.save_schedule(Schedule(
+                assignments=[Assignment("P001", "T001", "09:00-09:20")],
+                date="2025-10-04",
+                unscheduled_patients=[]
+            ))
+            
+            loaded = store.load_schedule()
+            assert list(loaded.by_patient) == ["P001"]
+            loaded.assignments.append(Assignment("P002", "T001", "09:20-09:40"))
+            loaded.assignments[0].timeslot = "09:40-10:00"
+            loaded.unscheduled_patients.append("P003")
+            
+            reloaded = store.load_schedule()
+            assert reloaded.assignments == [Assignment("P001", "T001", "09:00-09:20")]
+            assert reloaded.unscheduled_patients == []
+            assert list(reloaded.by_patient) == ["P001"]
+    
     def test_load_nonexistent_schedule(self):
         """Test loading schedule when none exists."""
         store = DataStore()
@@ -212,54 +273,30 @@ class TestSchedulingPipeline:
     @pytest.fixture
     def test_data_dir(self):
         """Return path to test data directory."""
-        return Path(__file__).parent / "data"
+        return TEST_DATA_DIR
     
-    def test_pipeline_preprocessing(self, test_data_dir):
+    def test_pipeline_preprocessing(self, preprocessed_store):
         """Test pipeline preprocessing steps."""
-        store = DataStore()
+        therapists = preprocessed_store.load_normalized_therapists()
+        assert len(therapists) == 3
+        assert '専従' in therapists.columns
         
-        with store.session():
-            store.copy_therapist_file(test_data_dir / "therapist.csv")
-            store.copy_prescription_file(test_data_dir / "prescription.csv") 
-            store.copy_shift_file(test_data_dir / "shift_test.xlsx")
-            
-            pipeline = SchedulingPipeline(store)
-            
-            # Test individual preprocessing steps
-            pipeline.preprocess_therapists()
-            therapists = store.load_normalized_therapists()
-            assert len(therapists) == 3
-            assert '専従' in therapists.columns
-            
-            pipeline.preprocess_prescriptions()
-            prescriptions = store.load_normalized_prescriptions()
-            assert len(prescriptions) == 3
-            
-            pipeline.preprocess_shifts("2025-10-04")
-            shifts = store.load_normalized_shifts()
-            assert len(shifts) == 3
-            assert 'therapist_name' in shifts.columns
-            assert 'availability' in shifts.columns
+        prescriptions = preprocessed_store.load_normalized_prescriptions()
+        assert len(prescriptions) == 3
+        
+        shifts = preprocessed_store.load_normalized_shifts()
+        assert len(shifts) == 3
+        assert 'therapist_name' in shifts.columns
+        assert 'availability' in shifts.columns
     
-    def test_pipeline_constraint_building(self, test_data_dir):
+    def test_pipeline_constraint_building(self, preprocessed_store):
         """Test pipeline constraint matrix building."""
-        store = DataStore()
-        
-        with store.session():
-            store.copy_therapist_file(test_data_dir / "therapist.csv")
-            store.copy_prescription_file(test_data_dir / "prescription.csv") 
-            store.copy_shift_file(test_data_dir / "shift_test.xlsx")
-            
-            pipeline = SchedulingPipeline(store)
-            pipeline.preprocess_all("2025-10-04")
-            pipeline.build_all_constraints()
-            
-            # Verify matrices were created
-            matrices = store.load_all_matrices()
-            assert matrices.patient_availability.shape[1] == 18  # 18 timeslots
-            assert matrices.therapist_availability.shape[1] == 18
-            assert len(matrices.patient_ids) == 3
-            assert len(matrices.therapist_ids) == 3
+        # Verify matrices were created
+        matrices = preprocessed_store.load_all_matrices()
+        assert matrices.patient_availability.shape[1] == 18  # 18 timeslots
+        assert matrices.therapist_availability.shape[1] == 18
+        assert len(matrices.patient_ids) == 3
+        assert len(matrices.therapist_ids) == 3
     
     def test_full_pipeline(self, test_data_dir):
         """Test complete pipeline execution."""
@@ -4,20 +4,20 @@ from schedule_agent.core.preprocessor import DataNormalizer
 from schedule_agent.core.constraints_builder import ConstraintMatrixBuilder
 from schedule_agent.core.scheduler import DeterministicScheduler
 
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
 
 class TestEndToEndPipeline:
     """Test complete workflow from raw data to schedule output"""
     
     def test_full_pipeline(self):
         """TC4.1: Full pipeline test"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         # Step 1: Load data
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_preprocessor_therapist.csv"))
-            store.copy_prescription_file(str(test_data_dir / "test_preprocessor_prescription.csv"))
-            store.copy_shift_file(str(test_data_dir / "test_preprocessor_shift.xlsx"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_preprocessor_therapist.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_preprocessor_prescription.csv"))
+            store.copy_shift_file(str(TEST_DATA_DIR / "test_preprocessor_shift.xlsx"))
             therapists = store.load_therapists()
             prescriptions = store.load_prescriptions()
             shifts = store.load_shifts()
@@ -41,11 +41,10 @@ class TestEndToEndPipeline:
         assert len(schedule.unscheduled_patients) == 0
         
         # Verify all patients scheduled with correct requirements
-        patient_assignments = {}
-        for assignment in schedule.assignments:
-            if assignment.patient_id not in patient_assignments:
-                patient_assignments[assignment.patient_id] = 0
-            patient_assignments[assignment.patient_id] += 1
+        patient_assignments = {
+            patient_id: len(assignments)
+            for patient_id, assignments in schedule.by_patient.items()
+        }
         
         # Patient with 脳血管疾患等Ⅰ should have 9 assignments (180 min)
         # Patient with 運動器疾患Ⅰ should have 6 assignments (120 min)
@@ -56,14 +55,12 @@ class TestEndToEndPipeline:
     
     def test_pipeline_with_constraints(self):
         """TC4.2: Pipeline with realistic constraints"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         # Run full pipeline with constraint data
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_constraints_therapist.csv"))
-            store.copy_prescription_file(str(test_data_dir / "test_constraints_prescription.csv"))
-            store.copy_shift_file(str(test_data_dir / "test_constraints_shift.xlsx"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_constraints_therapist.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_constraints_prescription.csv"))
+            store.copy_shift_file(str(TEST_DATA_DIR / "test_constraints_shift.xlsx"))
             therapists = store.load_therapists()
             prescriptions = store.load_prescriptions()
             shifts = store.load_shifts()
@@ -7,20 +7,20 @@ from schedule_agent.core.constraints_builder import ConstraintMatrixBuilder
 from schedule_agent.core.scheduler import DeterministicScheduler
 from schedule_agent.utils.visualization import ScheduleVisualizer
 
+TEST_DATA_DIR = Path(__file__).parent / "data"
+
 
 class TestVisualization:
     """Test visualization module with real test data"""
     
     def test_export_to_excel_basic(self, tmp_path):
         """Test export_to_excel creates valid Excel file with test data"""
-        test_data_dir = Path(__file__).parent / "data"
-        
         # Create schedule using test data
         store = DataStore()
         with store.session():
-            store.copy_therapist_file(str(test_data_dir / "test_preprocessor_therapist.csv"))
-            store.copy_prescription_file(str(test_data_dir / "test_preprocessor_prescription.csv"))
-            store.copy_shift_file(str(test_data_dir / "test_preprocessor_shift.xlsx"))
+            store.copy_therapist_file(str(TEST_DATA_DIR / "test_preprocessor_therapist.csv"))
+            store.copy_prescription_file(str(TEST_DATA_DIR / "test_preprocessor_prescription.csv"))
+            store.copy_shift_file(str(TEST_DATA_DIR / "test_preprocessor_shift.xlsx"))
             
             therapists = store.load_therapists()
             prescriptions = store.load_prescriptions()
@@ -52,14 +52,14 @@ class TestVisualization:
             assert result == output_path
             
             # Verify Excel has required sheets
-            excel_file = pd.ExcelFile(output_path)
-            assert '詳細' in excel_file.sheet_names
-            assert '患者別スケジュール' in excel_file.sheet_names
-            assert '職員別スケジュール' in excel_file.sheet_names
-            assert 'サマリー' in excel_file.sheet_names
-            
-            # Verify detailed sheet has data
-            df_detail = pd.read_excel(output_path, sheet_name='詳細')
+            with pd.ExcelFile(output_path) as excel_file:
+                assert '詳細' in excel_file.sheet_names
+                assert '患者別スケジュール' in excel_file.sheet_names
+                assert '職員別スケジュール' in excel_file.sheet_names
+                assert 'サマリー' in excel_file.sheet_names
+                
+                # Verify detailed sheet has data
+                df_detail = excel_file.parse('詳細')
             assert len(df_detail) > 0
             assert '患者ID' in df_detail.columns
             assert '職員ID' in df_detail.columns